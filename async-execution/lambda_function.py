@@ -1,36 +1,84 @@
-import json
+import asyncio
 import os
-import time
-from aws_lambda_powertools import Logger, Tracer, Metrics
-from aws_lambda_powertools.logging import correlation_paths
-from aws_lambda_powertools.metrics import MetricUnit
+import signal
+
+from aws_lambda_powertools.logging import Logger, correlation_paths
+from aws_lambda_powertools.logging.buffer import LoggerBufferConfig
+from aws_lambda_powertools.metrics import Metrics, MetricUnit
+from aws_lambda_powertools.tracing import Tracer
+
+# Resolve PowerTools configuration from the environment once at import
+SERVICE_NAME = os.getenv('POWERTOOLS_SERVICE_NAME', 'async-execution-lambda')
+METRICS_NAMESPACE = os.getenv('POWERTOOLS_METRICS_NAMESPACE', 'AsyncExecution')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
 # Initialize PowerTools with sensible defaults
 logger = Logger(
-    service=os.getenv('POWERTOOLS_SERVICE_NAME', 'async-execution-lambda'),
-    level=os.getenv('LOG_LEVEL', 'INFO')
+    service=SERVICE_NAME,
+    level=LOG_LEVEL,
+    # Debug context is buffered per invocation and only written when an error is logged
+    buffer_config=LoggerBufferConfig(max_bytes=10240, buffer_at_verbosity="DEBUG")
 )
 
 tracer = Tracer(
-    service=os.getenv('POWERTOOLS_SERVICE_NAME', 'async-execution-lambda')
+    service=SERVICE_NAME
 )
 
 metrics = Metrics(
-    namespace=os.getenv('POWERTOOLS_METRICS_NAMESPACE', 'AsyncExecution'),
-    service=os.getenv('POWERTOOLS_SERVICE_NAME', 'async-execution-lambda')
+    namespace=METRICS_NAMESPACE,
+    service=SERVICE_NAME
 )
 
-@tracer.capture_lambda_handler
-@logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST)
-@metrics.log_metrics
-def lambda_handler(event, context):
+# X-Ray tracing decorators are only applied when TRACING_ENABLED is true
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() == 'true'
+
+
+def maybe_trace(fn):
+    """Apply the tracer lambda handler decorator only when tracing is enabled"""
+    return tracer.capture_lambda_handler(fn) if TRACING_ENABLED else fn
+
+
+async def _sleep(seconds_delay):
+    """
+    Sleep for the delay on the event loop and return the seconds actually waited,
+    which is less than the delay when shutdown (SIGTERM) cut it short
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    sleep = asyncio.ensure_future(asyncio.sleep(seconds_delay))
+    # remove_signal_handler resets SIGTERM to SIG_DFL, so keep the previous handler to restore
+    previous_handler = signal.getsignal(signal.SIGTERM)
+    loop.add_signal_handler(signal.SIGTERM, sleep.cancel)
+    try:
+        await sleep
+    except asyncio.CancelledError:
+        pass
+    finally:
+        loop.remove_signal_handler(signal.SIGTERM)
+        if previous_handler is not None:
+            signal.signal(signal.SIGTERM, previous_handler)
+    return min(loop.time() - started, seconds_delay)
+
+
+# Invariant shape of the success response, copied and filled in per invocation
+_RESPONSE_TEMPLATE = {'status-code': 200, 'data': None}
+
+
+def _extract(event):
+    """Extract the contact ID and Parameters from an Amazon Connect event in a single pass"""
+    details = event.get('Details') or {}
+    contact_data = details.get('ContactData') or {}
+    return contact_data.get('ContactId', 'unknown'), details.get('Parameters') or {}
+
+
+async def handler_core(event, context):
     """
     Async Execution Lambda function that waits for a specified delay before returning
     """
 
     # Log the complete incoming event
-    logger.info("=== INCOMING AMAZON CONNECT EVENT ===")
-    logger.info("Full event received from Amazon Connect", extra={
+    logger.debug("=== INCOMING AMAZON CONNECT EVENT ===")
+    logger.debug("Full event received from Amazon Connect", extra={
         "event": event,
         "function_name": context.function_name,
         "function_version": context.function_version,
@@ -41,13 +89,11 @@ def lambda_handler(event, context):
     # Add custom metric
     metrics.add_metric(name="AsyncExecutionInvocation", unit=MetricUnit.Count, value=1)
 
-    # Extract contact information
-    contact_data = event.get('Details', {}).get('ContactData', {})
-    contact_id = contact_data.get('ContactId', 'unknown')
+    # Extract contact information and Amazon Connect Parameters
+    contact_id, parameters = _extract(event)
     
     try:
         # Extract SecondsDelay from Amazon Connect Parameters
-        parameters = event.get('Details', {}).get('Parameters', {})
         seconds_delay = parameters.get('SecondsDelay', 0)
         
         # Validate and convert to integer
@@ -74,23 +120,27 @@ def lambda_handler(event, context):
             logger.info(f"Adjusted delay to {seconds_delay} seconds")
         
         # Wait for the specified duration
+        message = f'Execution completed after {seconds_delay} seconds'
         if seconds_delay > 0:
-            logger.info(f"Starting delay of {seconds_delay} seconds")
-            time.sleep(seconds_delay)
-            logger.info(f"Completed delay of {seconds_delay} seconds")
+            logger.debug(f"Starting delay of {seconds_delay} seconds")
+            waited = await _sleep(seconds_delay)
+            if waited < seconds_delay:
+                logger.warning(f"Delay of {seconds_delay} seconds interrupted by shutdown after {waited:.2f} seconds")
+                seconds_delay = int(waited)
+                message = f'Execution interrupted after {seconds_delay} seconds'
+            else:
+                logger.debug(f"Completed delay of {seconds_delay} seconds")
         
-        # Create response
-        response = {
-            'status-code': 200,
-            'data': {
-                'seconds-delay': str(seconds_delay),
-                'message': f'Execution completed after {seconds_delay} seconds'
-            }
+        # Create response from the invariant template
+        response = _RESPONSE_TEMPLATE.copy()
+        response['data'] = {
+            'seconds-delay': str(seconds_delay),
+            'message': message
         }
 
         # Log the complete outgoing response
-        logger.info("=== OUTGOING RESPONSE TO AMAZON CONNECT ===")
-        logger.info("Full response being returned to Amazon Connect", extra={
+        logger.debug("=== OUTGOING RESPONSE TO AMAZON CONNECT ===")
+        logger.debug("Full response being returned to Amazon Connect", extra={
             "response": response,
             "contact_id": contact_id,
             "success": True,
@@ -115,3 +165,11 @@ def lambda_handler(event, context):
         }
         
         return error_response
+
+
+@maybe_trace
+@logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST)
+@metrics.log_metrics
+def lambda_handler(event, context):
+    """Run the async handler on a fresh event loop for each invocation"""
+    return asyncio.run(handler_core(event, context))
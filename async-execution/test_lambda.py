@@ -1,4 +1,7 @@
+import asyncio
 import json
+import signal
+import time
 import pytest
 from lambda_function import lambda_handler
 
@@ -9,6 +12,8 @@ class MockContext:
         self.function_name = "async-execution-test"
         self.function_version = "$LATEST"
         self.aws_request_id = "test-request-id"
+        self.memory_limit_in_mb = 512
+        self.invoked_function_arn = "arn:aws:lambda:eu-west-2:123456789012:function:async-execution-test"
         self.remaining_time_in_millis = 30000  # 30 seconds
     
     def get_remaining_time_in_millis(self):
@@ -116,5 +121,54 @@ def test_lambda_handler_with_contact_data():
     assert response['data']['seconds-delay'] == '3'
 
 
+def test_lambda_handler_delay_interrupted(monkeypatch):
+    """Test lambda handler stops waiting when SIGTERM arrives during the delay"""
+    event = {
+        "Details": {
+            "Parameters": {
+                "SecondsDelay": "20"
+            }
+        }
+    }
+    context = MockContext()
+    
+    # Deliver the shutdown callback from the event loop instead of signalling the test process
+    def deliver_sigterm(self, sig, callback, *args):
+        self.call_later(0.1, callback, *args)
+    monkeypatch.setattr(asyncio.SelectorEventLoop, 'add_signal_handler', deliver_sigterm)
+    monkeypatch.setattr(asyncio.SelectorEventLoop, 'remove_signal_handler', lambda self, sig: True)
+    
+    started = time.monotonic()
+    response = lambda_handler(event, context)
+    
+    assert time.monotonic() - started < 5
+    assert response['status-code'] == 200
+    assert response['data']['seconds-delay'] == '0'
+    assert response['data']['message'] == 'Execution interrupted after 0 seconds'
+
+
+def test_lambda_handler_delay_restores_sigterm_handler():
+    """Test the previous SIGTERM handler is restored once the delay completes"""
+    event = {
+        "Details": {
+            "Parameters": {
+                "SecondsDelay": "1"
+            }
+        }
+    }
+    context = MockContext()
+    
+    def handler(signum, frame):
+        pass
+    previous = signal.signal(signal.SIGTERM, handler)
+    try:
+        response = lambda_handler(event, context)
+        assert signal.getsignal(signal.SIGTERM) is handler
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+    
+    assert response['data']['message'] == 'Execution completed after 1 seconds'
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,65 +1,124 @@
-import base64
+import binascii
 import json
 import os
-from typing import Dict, Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
 
 import boto3
-from aws_lambda_powertools import Logger, Tracer, Metrics
-from aws_lambda_powertools.metrics import MetricUnit
+from aws_lambda_powertools.logging import Logger
+from aws_lambda_powertools.logging.buffer import LoggerBufferConfig
+from aws_lambda_powertools.metrics import Metrics, MetricUnit
+from aws_lambda_powertools.tracing import Tracer
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
-# Pre-import all required libraries at module level to avoid timeout
 try:
-    import aws_encryption_sdk
-    from aws_cryptographic_material_providers.mpl import AwsCryptographicMaterialProviders
-    from aws_cryptographic_material_providers.mpl.config import MaterialProvidersConfig
-    from aws_cryptographic_material_providers.mpl.models import CreateRawRsaKeyringInput, PaddingScheme
-    from cryptography.hazmat.primitives import serialization
-    from cryptography.hazmat.backends import default_backend
-    
-    # Initialize material providers at module level
-    MAT_PROVIDERS = AwsCryptographicMaterialProviders(config=MaterialProvidersConfig())
-    
-    # Create encryption client with compatible commitment policy for Amazon Connect
-    # Amazon Connect uses older algorithms that don't support key commitment
-    ENCRYPTION_CLIENT = aws_encryption_sdk.EncryptionSDKClient(
-        commitment_policy=aws_encryption_sdk.CommitmentPolicy.FORBID_ENCRYPT_ALLOW_DECRYPT
-    )
-    
-    logger = Logger(
-        service=os.getenv('POWERTOOLS_SERVICE_NAME', 'connect-encryption-lambda'),
-        level=os.getenv('LOG_LEVEL', 'INFO')
-    )
-    logger.info("Successfully initialized encryption libraries at module level")
-    
-except ImportError as e:
-    logger = Logger(
-        service=os.getenv('POWERTOOLS_SERVICE_NAME', 'connect-encryption-lambda'),
-        level=os.getenv('LOG_LEVEL', 'INFO')
-    )
-    logger.error(f"Failed to import encryption libraries: {str(e)}")
-    MAT_PROVIDERS = None
-    ENCRYPTION_CLIENT = None
-
-# Initialize PowerTools
-tracer = Tracer(service=os.getenv('POWERTOOLS_SERVICE_NAME', 'connect-encryption-lambda'))
+    from snapshot_restore_py import register_after_restore
+except ImportError:
+    # SnapStart runtime hooks are only available in the managed Python runtimes
+    def register_after_restore(func):
+        return func
+
+# Resolve configuration from the environment once at import
+SERVICE_NAME = os.getenv('POWERTOOLS_SERVICE_NAME', 'connect-encryption-lambda')
+METRICS_NAMESPACE = os.getenv('POWERTOOLS_METRICS_NAMESPACE', 'ConnectEncryption')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+AWS_REGION = os.getenv('AWS_REGION', 'eu-west-2')
+
+# Initialize PowerTools before the encryption imports for startup diagnostics
+# Debug context is buffered per invocation and only written when an error is logged
+logger = Logger(
+    service=SERVICE_NAME,
+    level=LOG_LEVEL,
+    buffer_config=LoggerBufferConfig(max_bytes=10240, buffer_at_verbosity="DEBUG")
+)
+tracer = Tracer(service=SERVICE_NAME)
 metrics = Metrics(
-    namespace=os.getenv('POWERTOOLS_METRICS_NAMESPACE', 'ConnectEncryption'),
-    service=os.getenv('POWERTOOLS_SERVICE_NAME', 'connect-encryption-lambda')
+    namespace=METRICS_NAMESPACE,
+    service=SERVICE_NAME
 )
 
+# X-Ray tracing decorators are only applied when TRACING_ENABLED is true
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() == 'true'
+
+
+def maybe_trace(fn):
+    """Apply the tracer lambda handler decorator only when tracing is enabled"""
+    return tracer.capture_lambda_handler(fn) if TRACING_ENABLED else fn
+
+
+def maybe_trace_method(fn):
+    """Apply the tracer method decorator only when tracing is enabled"""
+    return tracer.capture_method(fn) if TRACING_ENABLED else fn
+
+
+# Pre-import all required libraries at module level to avoid timeout
+# An ImportError here fails the init phase so Lambda never serves requests from a broken deployment
+import aws_encryption_sdk
+from aws_cryptographic_material_providers.mpl import AwsCryptographicMaterialProviders
+from aws_cryptographic_material_providers.mpl.config import MaterialProvidersConfig
+from aws_cryptographic_material_providers.mpl.models import CreateRawRsaKeyringInput, PaddingScheme
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.backends import default_backend
+
+# Initialize material providers at module level
+MAT_PROVIDERS = AwsCryptographicMaterialProviders(config=MaterialProvidersConfig())
+
+# Create encryption client with compatible commitment policy for Amazon Connect
+# Amazon Connect uses older algorithms that don't support key commitment
+ENCRYPTION_CLIENT = aws_encryption_sdk.EncryptionSDKClient(
+    commitment_policy=aws_encryption_sdk.CommitmentPolicy.FORBID_ENCRYPT_ALLOW_DECRYPT
+)
+
+logger.info("Successfully initialized encryption libraries at module level")
+
+# Throwaway RSA key written at image build time (see Dockerfile), never used to decrypt
+_PRIME_KEY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prime-key.pem')
+
+
+def _prime():
+    """Build a throwaway keyring at init so the first real request skips first-touch initialization"""
+    try:
+        with open(_PRIME_KEY_PATH, 'rb') as f:
+            throwaway_pem = f.read()
+    except OSError:
+        logger.debug("No prime key in the image, skipping keyring priming")
+        return
+    
+    try:
+        MAT_PROVIDERS.create_raw_rsa_keyring(input=CreateRawRsaKeyringInput(
+            key_namespace="prime",
+            key_name="prime",
+            private_key=throwaway_pem,
+            padding_scheme=PaddingScheme.OAEP_SHA512_MGF1
+        ))
+        logger.info("Primed keyring creation at module level")
+    except Exception as e:
+        logger.warning(f"Failed to prime keyring creation: {str(e)}")
+
+
+_prime()
+
+# Create the SSM client once per execution environment so warm invocations reuse it
+SSM_CLIENT = boto3.client('ssm', region_name=AWS_REGION)
+
+# Raw RSA keyrings cached per key ID as (created_at, keyring) for PK_CACHE_TTL seconds,
+# so warm invocations skip the Parameter Store call and PEM parsing until the TTL
+# expires and a rotated key is picked up
+_PK_TTL = int(os.getenv('PK_CACHE_TTL', '300'))
+_KEYRING_CACHE: Dict[str, Tuple[float, Any]] = {}
+
 
 class ConnectDecryption:
     """Fast Amazon Connect decryption service with pre-initialized components"""
     
     def __init__(self):
-        self.region = os.getenv('AWS_REGION', 'eu-west-2')
-        self.ssm_client = boto3.client('ssm', region_name=self.region)
+        self.ssm_client = SSM_CLIENT
         logger.info("Initialized Connect decryption service")
     
-    @tracer.capture_method
-    def get_private_key_pem(self, key_id: str) -> str:
-        """Get private key PEM from Parameter Store using key ID"""
+    @maybe_trace_method
+    def get_private_key_pem(self, key_id: str) -> bytes:
+        """Get UTF-8 encoded private key PEM from Parameter Store using key ID"""
         try:
             # Use key-id to construct the parameter name
             parameter_name = f"/amazon-connect/encryption/{key_id}/private-key"
@@ -69,45 +128,47 @@ class ConnectDecryption:
                 WithDecryption=True
             )
             
-            logger.info(f"Successfully retrieved private key from Parameter Store for key ID: {key_id}")
-            return response['Parameter']['Value']
+            logger.debug(f"Successfully retrieved private key from Parameter Store for key ID: {key_id}")
+            return response['Parameter']['Value'].encode('utf-8')
             
         except Exception as e:
             logger.error(f"Failed to get private key for key ID {key_id}: {str(e)}")
             raise
     
-    @tracer.capture_method
+    @maybe_trace_method
     def decrypt_data(self, encrypted_data: str, key_id: str) -> str:
         """Decrypt the encrypted data from Amazon Connect using pre-initialized components"""
         try:
-            logger.info(f"Starting decryption for key ID: {key_id}")
-            
-            # Check if libraries are available
-            if MAT_PROVIDERS is None or ENCRYPTION_CLIENT is None:
-                raise RuntimeError("Encryption libraries not properly initialized")
+            logger.debug(f"Starting decryption for key ID: {key_id}")
             
             # Base64 decode
-            encrypted_bytes = base64.b64decode(encrypted_data)
-            logger.info(f"Decoded {len(encrypted_bytes)} bytes")
-            
-            # Get private key using the key ID
-            private_key_pem = self.get_private_key_pem(key_id)
-            logger.info("Retrieved private key, preparing for keyring creation")
-            
-            # For AWS Cryptographic Material Providers Library, pass the PEM directly
-            # The library expects PEM format, not DER
-            keyring_input = CreateRawRsaKeyringInput(
-                key_namespace="AmazonConnect",
-                key_name=key_id,
-                private_key=private_key_pem.encode('utf-8'),  # Use PEM directly
-                padding_scheme=PaddingScheme.OAEP_SHA512_MGF1
-            )
+            encrypted_bytes = binascii.a2b_base64(encrypted_data)
+            logger.debug(f"Decoded {len(encrypted_bytes)} bytes")
             
-            keyring = MAT_PROVIDERS.create_raw_rsa_keyring(input=keyring_input)
-            logger.info(f"Created keyring for key ID: {key_id}")
+            entry = _KEYRING_CACHE.get(key_id)
+            if entry and time.monotonic() - entry[0] < _PK_TTL:
+                keyring = entry[1]
+                logger.debug(f"Using cached keyring for key ID: {key_id}")
+            else:
+                # Get private key using the key ID
+                private_key_pem = self.get_private_key_pem(key_id)
+                logger.debug("Retrieved private key, preparing for keyring creation")
+                
+                # For AWS Cryptographic Material Providers Library, pass the PEM directly
+                # The library expects PEM format, not DER
+                keyring_input = CreateRawRsaKeyringInput(
+                    key_namespace="AmazonConnect",
+                    key_name=key_id,
+                    private_key=private_key_pem,  # Use PEM directly
+                    padding_scheme=PaddingScheme.OAEP_SHA512_MGF1
+                )
+                
+                keyring = MAT_PROVIDERS.create_raw_rsa_keyring(input=keyring_input)
+                _KEYRING_CACHE[key_id] = (time.monotonic(), keyring)
+                logger.debug(f"Created keyring for key ID: {key_id}")
             
             # Decrypt using pre-initialized client
-            logger.info("Starting decryption operation")
+            logger.debug("Starting decryption operation")
             decrypted_bytes, decrypt_header = ENCRYPTION_CLIENT.decrypt(
                 source=encrypted_bytes,
                 keyring=keyring
@@ -115,7 +176,7 @@ class ConnectDecryption:
             
             # Convert to string
             decrypted_text = decrypted_bytes.decode('utf-8')
-            logger.info(f"Successfully decrypted {len(decrypted_text)} characters")
+            logger.debug(f"Successfully decrypted {len(decrypted_text)} characters")
             
             metrics.add_metric(name="DecryptionSuccess", unit=MetricUnit.Count, value=1)
             return decrypted_text
@@ -123,10 +184,19 @@ class ConnectDecryption:
         except Exception as e:
             logger.error(f"Decryption failed: {str(e)}")
             logger.error(f"Error type: {type(e).__name__}")
+            # Drop cached key material so a rotated key is fetched on the next attempt
+            _KEYRING_CACHE.pop(key_id, None)
             metrics.add_metric(name="DecryptionError", unit=MetricUnit.Count, value=1)
             raise
 
 
+def _extract(event: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Extract the contact ID and Parameters from an Amazon Connect event in a single pass"""
+    details = event.get('Details') or {}
+    contact_data = details.get('ContactData') or {}
+    return contact_data.get('ContactId', 'unknown'), details.get('Parameters') or {}
+
+
 def create_connect_response(success: bool, message: str, decrypted_data: Optional[str] = None, 
                           contact_id: str = "unknown", request_id: str = "unknown", 
                           error: str = None) -> Dict[str, Any]:
@@ -158,7 +228,53 @@ def create_connect_response(success: bool, message: str, decrypted_data: Optiona
     return response
 
 
-@tracer.capture_lambda_handler
+# Decryption service shared across invocations in the same execution environment
+DECRYPTION_SERVICE = ConnectDecryption()
+
+# Fanned out warmer invocations stay busy briefly so each one lands in its own execution environment
+WARMER_DELAY_SECONDS = 0.075
+# Upper bound on the concurrency a warmer event can request, so one ping cannot fan out unbounded invocations
+MAX_WARMER_CONCURRENCY = 10
+LAMBDA_CLIENT = None
+
+
+def fan_out_warmers(context: LambdaContext, concurrency: int) -> None:
+    """Invoke this function concurrency - 1 more times in parallel to warm multiple execution environments"""
+    global LAMBDA_CLIENT
+    if LAMBDA_CLIENT is None:
+        LAMBDA_CLIENT = boto3.client('lambda', region_name=AWS_REGION)
+    
+    concurrency = min(concurrency, MAX_WARMER_CONCURRENCY)
+    payload = json.dumps({"warmer": True, "fanned-out": True})
+    with ThreadPoolExecutor(max_workers=concurrency - 1) as executor:
+        futures = [
+            executor.submit(
+                LAMBDA_CLIENT.invoke,
+                FunctionName=context.invoked_function_arn,
+                InvocationType='RequestResponse',
+                Payload=payload
+            )
+            for _ in range(concurrency - 1)
+        ]
+    
+    failed = [error for error in (future.exception() for future in futures) if error is not None]
+    for error in failed:
+        logger.warning(f"Warmer invocation failed: {str(error)}")
+    logger.debug(f"Fanned out {concurrency - 1} warmer invocations, {len(failed)} failed")
+
+
+@register_after_restore
+def _after_restore() -> None:
+    """Recreate network clients and drop cached key material after a SnapStart restore"""
+    global SSM_CLIENT, LAMBDA_CLIENT
+    SSM_CLIENT = boto3.client('ssm', region_name=AWS_REGION)
+    DECRYPTION_SERVICE.ssm_client = SSM_CLIENT
+    LAMBDA_CLIENT = None
+    _KEYRING_CACHE.clear()
+    logger.info("Reinitialized clients after SnapStart restore")
+
+
+@maybe_trace
 @logger.inject_lambda_context
 @metrics.log_metrics
 def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, Any]:
@@ -179,9 +295,24 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
     }
     """
     
+    # Scheduled warmer pings keep execution environments warm without touching SSM or decrypting
+    if event.get('source') == 'aws.events' or event.get('warmer'):
+        logger.debug("Warmer ping")
+        if event.get('fanned-out'):
+            time.sleep(WARMER_DELAY_SECONDS)
+        else:
+            try:
+                concurrency = int(event.get('concurrency', 1))
+            except (ValueError, TypeError):
+                logger.warning(f"Invalid warmer concurrency: {event.get('concurrency')}, defaulting to 1")
+                concurrency = 1
+            if concurrency > 1:
+                fan_out_warmers(context, concurrency)
+        return {"warmed": True}
+    
     # Log the complete incoming event
-    logger.info("=== INCOMING AMAZON CONNECT EVENT ===")
-    logger.info("Full event received from Amazon Connect", extra={
+    logger.debug("=== INCOMING AMAZON CONNECT EVENT ===")
+    logger.debug("Full event received from Amazon Connect", extra={
         "event": event,
         "function_name": context.function_name,
         "function_version": context.function_version,
@@ -191,18 +322,14 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
     
     # Log remaining time for debugging
     remaining_time = context.get_remaining_time_in_millis()
-    logger.info(f"Lambda started with {remaining_time}ms remaining")
-    
-    # Extract contact information
-    contact_data = event.get('Details', {}).get('ContactData', {})
-    contact_id = contact_data.get('ContactId', 'unknown')
+    logger.debug(f"Lambda started with {remaining_time}ms remaining")
     
-    # Extract parameters
-    parameters = event.get('Details', {}).get('Parameters', {})
+    # Extract contact information and parameters
+    contact_id, parameters = _extract(event)
     encrypted_data = parameters.get('my-secret-string')
     key_id = parameters.get('key-id')
     
-    logger.info("Processing decryption request", extra={
+    logger.debug("Processing decryption request", extra={
         "contact_id": contact_id,
         "has_encrypted_data": bool(encrypted_data),
         "has_key_id": bool(key_id),
@@ -230,16 +357,15 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
                 error="Missing required parameter"
             )
         
-        # Initialize decryption service and decrypt
+        # Decrypt using the module level decryption service
         start_time = context.get_remaining_time_in_millis()
-        decryption_service = ConnectDecryption()
-        decrypted_data = decryption_service.decrypt_data(encrypted_data, key_id)
+        decrypted_data = DECRYPTION_SERVICE.decrypt_data(encrypted_data, key_id)
         end_time = context.get_remaining_time_in_millis()
         
         logger.info(f"Decryption took {start_time - end_time}ms")
         
         # Log the decrypted result (remove in production for security)
-        logger.info(f"Decryption successful. Decrypted data: {decrypted_data}")
+        logger.debug(f"Decryption successful. Decrypted data: {decrypted_data}")
         
         # Return success response
         response = create_connect_response(
@@ -251,8 +377,8 @@ def lambda_handler(event: Dict[str, Any], context: LambdaContext) -> Dict[str, A
         )
         
         # Log the complete outgoing response
-        logger.info("=== OUTGOING RESPONSE TO AMAZON CONNECT ===")
-        logger.info("Full response being returned to Amazon Connect", extra={
+        logger.debug("=== OUTGOING RESPONSE TO AMAZON CONNECT ===")
+        logger.debug("Full response being returned to Amazon Connect", extra={
             "response": response,
             "contact_id": contact_id,
             "success": True,
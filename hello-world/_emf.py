@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+import time
+
+
+class EmfMetrics:
+    """
+    Stand-in for PowerTools Metrics that writes each metric straight to stdout as a
+    CloudWatch Embedded Metric Format line, built from a per-metric template
+    """
+    
+    def __init__(self, namespace, service):
+        self.namespace = namespace
+        self.service = service
+        self._templates = {}
+    
+    def _template(self, name, unit):
+        """EMF line for name and unit with the timestamp and value left as %d and %s"""
+        definition = json.dumps([{
+            "Namespace": self.namespace,
+            "Dimensions": [["service"]],
+            "Metrics": [{"Name": name, "Unit": getattr(unit, 'value', unit)}]
+        }], separators=(',', ':'))
+        fields = json.dumps({"service": self.service, name: 0}, separators=(',', ':'))[1:-2]
+        return (
+            '{"_aws":{"Timestamp":%d,"CloudWatchMetrics":'
+            + definition.replace('%', '%%')
+            + '},'
+            + fields.replace('%', '%%')
+            + '%s}\n'
+        )
+    
+    def add_metric(self, name, unit, value):
+        template = self._templates.get((name, unit))
+        if template is None:
+            template = self._templates[(name, unit)] = self._template(name, unit)
+        sys.stdout.write(template % (time.time_ns() // 1_000_000, float(value)))
+    
+    def flush_metrics(self):
+        # Every metric is written as soon as it is added
+        pass
+
+
+# Resolve the metric namespace and service dimension from the environment once at import
+SERVICE_NAME = os.getenv('POWERTOOLS_SERVICE_NAME', 'hello-world-lambda')
+METRICS_NAMESPACE = os.getenv('POWERTOOLS_METRICS_NAMESPACE', 'HelloWorld')
+
+metrics = EmfMetrics(
+    namespace=METRICS_NAMESPACE,
+    service=SERVICE_NAME
+)
@@ -0,0 +1,147 @@
+import functools
+import os
+import queue
+import sys
+import threading
+from aws_lambda_powertools.logging import Logger, correlation_paths
+from aws_lambda_powertools.logging.buffer import LoggerBufferConfig
+from aws_lambda_powertools.tracing import Tracer
+from aws_lambda_powertools.utilities import jmespath_utils
+
+from _emf import SERVICE_NAME, metrics
+
+try:
+    import orjson
+except ImportError:
+    # Fall back to the PowerTools stdlib json serializer
+    orjson = None
+
+
+class BatchedConsole:
+    """Stdout stream that coalesces log lines into a single write on a background thread"""
+    
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        threading.Thread(target=self._drain, daemon=True).start()
+    
+    def write(self, line):
+        self._queue.put(line)
+    
+    def flush(self):
+        # Called by the logging handler after every record, writes happen in _drain
+        pass
+    
+    def wait(self):
+        """Block until every queued line has been written to stdout"""
+        self._queue.join()
+    
+    def _drain(self):
+        while True:
+            lines = [self._queue.get()]
+            while len(lines) < self.batch_size:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            sys.stdout.write(''.join(lines))
+            sys.stdout.flush()
+            for _ in lines:
+                self._queue.task_done()
+
+
+# Resolve PowerTools configuration from the environment once at import
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+
+# At DEBUG the log buffer is switched off so the event and response records are written
+VERBOSE_LOGGING = LOG_LEVEL.upper() == 'DEBUG'
+
+# Batch log writes when CONSOLE_LOGGING_BUFFER_SIZE is set to the maximum lines per write
+CONSOLE_LOGGING_BUFFER_SIZE = int(os.getenv('CONSOLE_LOGGING_BUFFER_SIZE', '0'))
+CONSOLE = BatchedConsole(CONSOLE_LOGGING_BUFFER_SIZE) if CONSOLE_LOGGING_BUFFER_SIZE > 0 else None
+
+
+def orjson_dumps(obj):
+    """Serialize a log record with orjson, stringifying anything it can't encode"""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Initialize PowerTools with sensible defaults
+logger = Logger(
+    service=SERVICE_NAME,
+    level=LOG_LEVEL,
+    # Otherwise debug context is buffered per invocation and only written when an error is logged
+    buffer_config=None if VERBOSE_LOGGING else LoggerBufferConfig(max_bytes=10240, buffer_at_verbosity="DEBUG"),
+    stream=CONSOLE,
+    json_serializer=orjson_dumps if orjson else None
+)
+
+# X-Ray subsegments are only opened when TRACING_ENABLED is true, and the Tracer
+# (which patches boto and friends on creation) is only built in that case
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() == 'true'
+
+
+def build_tracer():
+    """Create the Tracer when tracing is enabled, called again after a SnapStart restore"""
+    return Tracer(
+        service=SERVICE_NAME
+    ) if TRACING_ENABLED else None
+
+
+tracer = build_tracer()
+
+# Log the full incoming event when POWERTOOLS_LOGGER_LOG_EVENT is true
+LOG_EVENT = os.getenv('POWERTOOLS_LOGGER_LOG_EVENT', 'false').lower() == 'true'
+
+
+def make_fused_handler(core, logger, tracer, metrics, correlation_id_path):
+    """
+    Wrap core with lambda context injection, tracing and metric flushing in a single
+    frame instead of stacking the three PowerTools handler decorators
+    """
+    cold_start = True
+
+    @functools.wraps(core)
+    def handler(event, context):
+        nonlocal cold_start
+        is_cold_start, cold_start = cold_start, False
+
+        logger.append_keys(
+            cold_start=is_cold_start,
+            function_name=context.function_name,
+            function_memory_size=context.memory_limit_in_mb,
+            function_arn=context.invoked_function_arn,
+            function_request_id=context.aws_request_id
+        )
+        logger.set_correlation_id(jmespath_utils.query(envelope=correlation_id_path, data=event))
+        if LOG_EVENT:
+            logger.info(event)
+
+        try:
+            if TRACING_ENABLED:
+                with tracer.provider.in_subsegment(name=f"## {core.__name__}") as subsegment:
+                    subsegment.put_annotation(key="ColdStart", value=is_cold_start)
+                    subsegment.put_annotation(key="Service", value=tracer.service)
+                    return core(event, context)
+            return core(event, context)
+        except Exception:
+            logger.flush_buffer()
+            raise
+        finally:
+            metrics.flush_metrics()
+
+    return handler
+
+
+def drain():
+    """
+    Drop the DEBUG records buffered during the invocation and wait for the batched
+    console, called by lambda_function after every invocation with or without the wrapper
+    """
+    logger.clear_buffer()
+    if CONSOLE:
+        CONSOLE.wait()
+
+
+# Correlation id path handed to make_fused_handler by lambda_function
+CORRELATION_ID_PATH = correlation_paths.API_GATEWAY_REST
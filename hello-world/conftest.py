@@ -0,0 +1,13 @@
+import os
+
+# Run the bare handler under pytest, the fused PowerTools wrapper is tested directly
+os.environ.setdefault('POWERTOOLS_ENABLED', '0')
+
+import pytest
+from lambda_function import lambda_handler
+
+
+@pytest.fixture(scope="session")
+def handler():
+    """Lambda handler imported once for the whole test session"""
+    return lambda_handler
@@ -1,86 +1,159 @@
-import json
+import functools
+import logging
 import os
-from aws_lambda_powertools import Logger, Tracer, Metrics
-from aws_lambda_powertools.logging import correlation_paths
-from aws_lambda_powertools.metrics import MetricUnit
-
-# Initialize PowerTools with sensible defaults
-logger = Logger(
-    service=os.getenv('POWERTOOLS_SERVICE_NAME', 'hello-world-lambda'),
-    level=os.getenv('LOG_LEVEL', 'INFO')
-)
-
-tracer = Tracer(
-    service=os.getenv('POWERTOOLS_SERVICE_NAME', 'hello-world-lambda')
-)
-
-metrics = Metrics(
-    namespace=os.getenv('POWERTOOLS_METRICS_NAMESPACE', 'HelloWorld'),
-    service=os.getenv('POWERTOOLS_SERVICE_NAME', 'hello-world-lambda')
-)
-
-@tracer.capture_lambda_handler
-@logger.inject_lambda_context(correlation_id_path=correlation_paths.API_GATEWAY_REST)
-@metrics.log_metrics
-def lambda_handler(event, context):
+
+try:
+    from snapshot_restore_py import register_after_restore, register_before_snapshot
+except ImportError:
+    # SnapStart runtime hooks are only available in the managed Python runtimes
+    def register_before_snapshot(func):
+        return func
+    
+    register_after_restore = register_before_snapshot
+
+# PowerTools is imported on the first invocation rather than at init. Setting
+# POWERTOOLS_ENABLED to anything but "1" never imports it, logging through the
+# standard library and still writing metrics as EMF lines
+POWERTOOLS_ENABLED = os.getenv('POWERTOOLS_ENABLED', '1') == '1'
+
+# The full event and response are only logged when running at DEBUG
+VERBOSE_LOGGING = os.getenv('LOG_LEVEL', 'INFO').upper() == 'DEBUG'
+
+
+@functools.lru_cache(maxsize=1)
+def _pt():
+    """Return the (logger, tracer, metrics) singletons, importing PowerTools only when it is enabled"""
+    if not POWERTOOLS_ENABLED:
+        import _emf
+        logger = logging.getLogger(__name__)
+        logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+        return logger, None, _emf.metrics
+    import _powertools
+    return _powertools.logger, _powertools.tracer, _powertools.metrics
+
+
+# Invariant shape of the success and error responses, copied and filled in per invocation
+_RESPONSE_TEMPLATE = {'status-code': 200, 'data': None}
+_ERROR_RESPONSE_TEMPLATE = {'status-code': 500, 'data': None}
+
+
+def _build_response(name):
+    """Fill a fresh copy of the response template in with the greeting for name"""
+    response = _RESPONSE_TEMPLATE.copy()
+    response['data'] = {
+        'name': name,
+        'message': f'Hello, {name}!'
+    }
+    return response
+
+
+_DEFAULT_NAME = 'World'
+
+
+def _extract(event):
+    """Extract the contact ID and Parameters from an Amazon Connect event in a single pass"""
+    details = event.get('Details') or {}
+    contact_data = details.get('ContactData') or {}
+    return contact_data.get('ContactId', 'unknown'), details.get('Parameters') or {}
+
+
+def handler_core(event, context):
     """
     Hello World Lambda function with AWS PowerTools
     """
+    logger, _, metrics = _pt()
+
+    # Scheduled warmer pings keep the execution environment warm without doing any work
+    if event.get('source') == 'aws.events' or event.get('warmer'):
+        logger.debug("Warmer ping")
+        return {"warmed": True}
 
     # Log the complete incoming event
-    logger.info("=== INCOMING AMAZON CONNECT EVENT ===")
-    logger.info("Full event received from Amazon Connect", extra={
-        "event": event,
-        "function_name": context.function_name,
-        "function_version": context.function_version,
-        "aws_request_id": context.aws_request_id,
-        "remaining_time_ms": context.get_remaining_time_in_millis()
-    })
+    if VERBOSE_LOGGING:
+        logger.debug("=== INCOMING AMAZON CONNECT EVENT ===", extra={
+            "event": event,
+            "function_name": context.function_name,
+            "function_version": context.function_version,
+            "aws_request_id": context.aws_request_id,
+            "remaining_time_ms": context.get_remaining_time_in_millis()
+        })
 
     # Add custom metric
-    metrics.add_metric(name="HelloWorldInvocation", unit=MetricUnit.Count, value=1)
+    metrics.add_metric(name="HelloWorldInvocation", unit="Count", value=1)
 
-    # Extract contact information
-    contact_data = event.get('Details', {}).get('ContactData', {})
-    contact_id = contact_data.get('ContactId', 'unknown')
+    # Extract contact information and Amazon Connect Parameters
+    contact_id, parameters = _extract(event)
     
     try:
-        # Extract Name from Amazon Connect Parameters
-        parameters = event.get('Details', {}).get('Parameters', {})
-        name = parameters.get('Name', 'World')
-        
-        # Log the processing
-        logger.info(f"Processing hello message for: {name}")
+        # Extract Name from Amazon Connect Parameters, empty Parameters skip the lookup
+        name = parameters.get('Name', _DEFAULT_NAME) if parameters else _DEFAULT_NAME
+    except (AttributeError, TypeError) as e:
+        # Parameters that aren't a mapping are the only expected failure, no traceback needed
+        logger.error("Error processing request: %s: %s", type(e).__name__, e, extra={
+            "contact_id": contact_id
+        })
         
-        # Create response
-        response = {
-            'status-code': 200,
-            'data': {
-                'name': name,
-                'message': f'Hello, {name}!'
-            }
+        error_response = _ERROR_RESPONSE_TEMPLATE.copy()
+        error_response['data'] = {
+            'error': 'Internal server error',
+            'message': str(e)
         }
+        
+        return error_response
+    
+    # Create response from the invariant template
+    response = _build_response(name)
 
-        # Log the complete outgoing response
-        logger.info("=== OUTGOING RESPONSE TO AMAZON CONNECT ===")
-        logger.info("Full response being returned to Amazon Connect", extra={
+    # Log the complete outgoing response
+    if VERBOSE_LOGGING:
+        logger.debug("=== OUTGOING RESPONSE TO AMAZON CONNECT ===", extra={
             "response": response,
             "contact_id": contact_id,
             "success": True,
             "remaining_time_ms": context.get_remaining_time_in_millis()
         })
-        
-        return response
-        
-    except Exception as e:
-        logger.error(f"Error processing request: {str(e)}", exc_info=True)
-        
-        error_response = {
-            'status-code': 500,
-            'data': {
-                'error': 'Internal server error',
-                'message': str(e)
-            }
-        }
-        
-        return error_response
+    
+    # Single INFO line per invocation, written once the outcome is known
+    logger.info("Processed hello message for: %s", name, extra={
+        "contact_id": contact_id,
+        "status_code": response['status-code']
+    })
+    
+    return response
+
+
+_handler = None
+
+
+@register_before_snapshot
+def _before_snapshot():
+    """Import PowerTools before a SnapStart snapshot so restored environments start with it loaded"""
+    _pt()
+
+
+@register_after_restore
+def _after_restore():
+    """Recreate the Tracer, whose X-Ray emitter socket is not valid after a SnapStart restore"""
+    global _handler
+    if POWERTOOLS_ENABLED:
+        import _powertools
+        _powertools.tracer = _powertools.build_tracer()
+    _pt.cache_clear()
+    _handler = None
+
+
+def lambda_handler(event, context):
+    """Build the PowerTools wrapped handler on the first invocation, then reuse it"""
+    global _handler
+    if _handler is None:
+        if POWERTOOLS_ENABLED:
+            import _powertools
+            _handler = _powertools.make_fused_handler(handler_core, *_pt(), _powertools.CORRELATION_ID_PATH)
+        else:
+            _handler = handler_core
+    try:
+        return _handler(event, context)
+    finally:
+        if POWERTOOLS_ENABLED:
+            import _powertools
+            _powertools.drain()
@@ -0,0 +1,12 @@
+# Optional Cython build of the handler module, see "Cython Build" in README.md
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+setup(
+    name="hello-world-lambda",
+    ext_modules=cythonize(
+        [Extension("lambda_function", ["lambda_function.py"])],
+        language_level=3,
+        compiler_directives={'boundscheck': False, 'wraparound': False}
+    )
+)
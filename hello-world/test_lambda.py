@@ -1,86 +1,271 @@
+import functools
 import json
+import logging
 import pytest
-from lambda_function import lambda_handler
+from _emf import EmfMetrics
+import lambda_function
 
 
 class MockContext:
     """Mock Lambda context for testing"""
+    __slots__ = (
+        'function_name',
+        'function_version',
+        'aws_request_id',
+        'memory_limit_in_mb',
+        'invoked_function_arn',
+        'remaining_time_in_millis'
+    )
+    
     def __init__(self):
         self.function_name = "hello-world-test"
         self.function_version = "$LATEST"
         self.aws_request_id = "test-request-id"
+        self.memory_limit_in_mb = 512
+        self.invoked_function_arn = "arn:aws:lambda:eu-west-2:123456789012:function:hello-world-test"
         self.remaining_time_in_millis = 30000  # 30 seconds
     
     def get_remaining_time_in_millis(self):
         return self.remaining_time_in_millis
 
 
-def test_lambda_handler_with_name():
-    """Test lambda handler with a name parameter"""
-    event = {
-        "Details": {
-            "Parameters": {
-                "Name": "Alice"
-            }
+# The handler never mutates its event, so the test events are shared module constants
+EVENT_WITH_NAME = {
+    "Details": {
+        "Parameters": {
+            "Name": "Alice"
         }
     }
-    context = MockContext()
-    
-    response = lambda_handler(event, context)
+}
+
+EVENT_WITH_CONTACT_DATA = {
+    "Details": {
+        "ContactData": {
+            "ContactId": "04535341-6712-4b6d-a710-bf5c5df4ba78"
+        },
+        "Parameters": {
+            "Name": "Bob"
+        }
+    },
+    "Name": "ContactFlowEvent"
+}
+
+EVENT_EMPTY_PARAMETERS = {
+    "Details": {
+        "Parameters": {}
+    }
+}
+
+EVENT_INVALID_PARAMETERS = {
+    "Details": {
+        "Parameters": ["Name", "Alice"]
+    }
+}
+
+EVENT_UNHASHABLE_NAME = {
+    "Details": {
+        "Parameters": {
+            "Name": ["a"]
+        }
+    }
+}
+
+EVENT_WARMER = {"warmer": True}
+
+
+@pytest.fixture(scope="module")
+def ctx():
+    """Mock Lambda context shared by every test in the module"""
+    return MockContext()
+
+
+def test_lambda_handler_with_name(handler, ctx):
+    """Test lambda handler with a name parameter"""
+    response = handler(EVENT_WITH_NAME, ctx)
     
     assert response['status-code'] == 200
     assert response['data']['name'] == 'Alice'
     assert response['data']['message'] == 'Hello, Alice!'
 
 
-def test_lambda_handler_no_name():
+def test_lambda_handler_no_name(handler, ctx):
     """Test lambda handler with no name (default 'World')"""
-    event = {}
-    context = MockContext()
-    
-    response = lambda_handler(event, context)
+    response = handler({}, ctx)
     
     assert response['status-code'] == 200
     assert response['data']['name'] == 'World'
     assert response['data']['message'] == 'Hello, World!'
 
 
-def test_lambda_handler_with_contact_data():
+def test_lambda_handler_with_contact_data(handler, ctx):
     """Test lambda handler with Amazon Connect contact data"""
-    event = {
-        "Details": {
-            "ContactData": {
-                "ContactId": "04535341-6712-4b6d-a710-bf5c5df4ba78"
-            },
-            "Parameters": {
-                "Name": "Bob"
-            }
-        },
-        "Name": "ContactFlowEvent"
-    }
-    context = MockContext()
-    
-    response = lambda_handler(event, context)
+    response = handler(EVENT_WITH_CONTACT_DATA, ctx)
     
     assert response['status-code'] == 200
     assert response['data']['name'] == 'Bob'
     assert response['data']['message'] == 'Hello, Bob!'
 
 
-def test_lambda_handler_empty_parameters():
+def test_lambda_handler_empty_parameters(handler, ctx):
     """Test lambda handler with empty parameters"""
-    event = {
-        "Details": {
-            "Parameters": {}
-        }
-    }
-    context = MockContext()
-    
-    response = lambda_handler(event, context)
+    response = handler(EVENT_EMPTY_PARAMETERS, ctx)
     
     assert response['status-code'] == 200
     assert response['data']['name'] == 'World'
 
 
+def test_lambda_handler_invalid_parameters(handler, ctx):
+    """Test lambda handler returns an error response when Parameters isn't a mapping"""
+    response = handler(EVENT_INVALID_PARAMETERS, ctx)
+    
+    assert response['status-code'] == 500
+    assert response['data']['error'] == 'Internal server error'
+
+
+def test_lambda_handler_repeat_name_returns_fresh_response(handler, ctx):
+    """Test repeat invocations with the same name return equal but separate responses"""
+    first = handler(EVENT_WITH_NAME, ctx)
+    second = handler(EVENT_WITH_NAME, ctx)
+    
+    assert second == first
+    assert second is not first
+
+
+def test_lambda_handler_unhashable_name(handler, ctx):
+    """Test a non-string Name is still greeted"""
+    response = handler(EVENT_UNHASHABLE_NAME, ctx)
+    
+    assert response['status-code'] == 200
+    assert response['data']['message'] == "Hello, ['a']!"
+
+
+def test_lambda_handler_warmer_ping(handler, ctx):
+    """Test lambda handler returns immediately for a warmer ping"""
+    response = handler(EVENT_WARMER, ctx)
+    
+    assert response == {"warmed": True}
+
+
+def test_fused_handler_injects_lambda_context(ctx):
+    """Test fused handler appends the lambda context to log records"""
+    import _powertools
+    fused = _powertools.make_fused_handler(
+        lambda_function.handler_core,
+        _powertools.logger,
+        _powertools.tracer,
+        _powertools.metrics,
+        _powertools.CORRELATION_ID_PATH
+    )
+    
+    fused({}, ctx)
+    keys = _powertools.logger.get_current_keys()
+    
+    assert keys['function_request_id'] == 'test-request-id'
+    assert keys['function_arn'] == ctx.invoked_function_arn
+
+
+def test_lambda_handler_powertools_disabled(monkeypatch, capsys, handler, ctx):
+    """Test lambda handler runs the bare handler with stdlib logging and EMF metrics when POWERTOOLS_ENABLED is off"""
+    monkeypatch.setattr(lambda_function, 'POWERTOOLS_ENABLED', False)
+    monkeypatch.setattr(lambda_function, '_handler', None)
+    monkeypatch.setattr(lambda_function, '_pt', functools.lru_cache(maxsize=1)(lambda_function._pt.__wrapped__))
+    
+    response = handler(EVENT_WITH_CONTACT_DATA, ctx)
+    
+    assert lambda_function._handler is lambda_function.handler_core
+    assert isinstance(lambda_function._pt()[0], logging.Logger)
+    assert isinstance(lambda_function._pt()[2], EmfMetrics)
+    assert response['data']['message'] == 'Hello, Bob!'
+    assert json.loads(capsys.readouterr().out)['HelloWorldInvocation'] == 1
+
+
+@pytest.mark.skipif(lambda_function.VERBOSE_LOGGING, reason="the log buffer is off at DEBUG")
+def test_lambda_handler_powertools_enabled(monkeypatch, handler, ctx):
+    """Test lambda handler builds the fused PowerTools handler and clears the log buffer after each call"""
+    import _powertools
+    monkeypatch.setenv('_X_AMZN_TRACE_ID', 'Root=1-5759e988-bd862e3fe1be46a994272793;Sampled=1')
+    monkeypatch.setattr(lambda_function, 'POWERTOOLS_ENABLED', True)
+    monkeypatch.setattr(lambda_function, '_handler', None)
+    monkeypatch.setattr(lambda_function, '_pt', functools.lru_cache(maxsize=1)(lambda_function._pt.__wrapped__))
+    
+    # Record what is buffered for this trace at the point lambda_handler drains
+    buffered = []
+    drain = _powertools.drain
+    
+    def recording_drain():
+        buffered.append(list(_powertools.logger._buffer_cache.get('1-5759e988-bd862e3fe1be46a994272793')))
+        drain()
+    monkeypatch.setattr(_powertools, 'drain', recording_drain)
+    
+    response = handler(EVENT_WARMER, ctx)
+    
+    assert response == {"warmed": True}
+    assert lambda_function._handler.__wrapped__ is lambda_function.handler_core
+    assert _powertools.logger.get_current_keys()['function_request_id'] == 'test-request-id'
+    assert len(buffered) == 1 and buffered[0]
+    assert not _powertools.logger._buffer_cache.get('1-5759e988-bd862e3fe1be46a994272793')
+
+
+def test_after_restore_rebuilds_handler(handler, ctx):
+    """Test the SnapStart restore hook drops the cached PowerTools objects and handler"""
+    handler(EVENT_WITH_NAME, ctx)
+    
+    lambda_function._after_restore()
+    
+    assert lambda_function._handler is None
+    assert lambda_function._pt.cache_info().currsize == 0
+    assert handler(EVENT_WITH_NAME, ctx)['data']['message'] == 'Hello, Alice!'
+
+
+def test_tracer_skipped_when_tracing_disabled():
+    """Test the Tracer is only created when TRACING_ENABLED is true"""
+    import _powertools
+    assert (_powertools.tracer is None) == (not _powertools.TRACING_ENABLED)
+
+
+def test_log_buffer_skipped_when_verbose():
+    """Test DEBUG records are written directly rather than buffered when LOG_LEVEL is DEBUG"""
+    import _powertools
+    assert (_powertools.logger._buffer_config is None) == _powertools.VERBOSE_LOGGING
+
+
+def test_emf_metrics_prints_metric(capsys):
+    """Test EmfMetrics writes each metric straight to stdout in EMF"""
+    EmfMetrics(namespace="HelloWorld", service="hello-world-test").add_metric(
+        name="HelloWorldInvocation", unit="Count", value=1
+    )
+    
+    emf = json.loads(capsys.readouterr().out)
+    
+    assert emf['_aws']['CloudWatchMetrics'][0]['Namespace'] == 'HelloWorld'
+    assert emf['_aws']['CloudWatchMetrics'][0]['Metrics'] == [{'Name': 'HelloWorldInvocation', 'Unit': 'Count'}]
+    assert emf['service'] == 'hello-world-test'
+    assert emf['HelloWorldInvocation'] == 1
+
+
+def test_orjson_dumps_log_record():
+    """Test orjson serializer emits compact JSON and stringifies unknown types"""
+    from _powertools import orjson_dumps
+    record = {"level": "INFO", "extra": {1: object.__name__}, "obj": MockContext}
+    
+    assert json.loads(orjson_dumps(record)) == {
+        "level": "INFO",
+        "extra": {"1": "object"},
+        "obj": str(MockContext)
+    }
+
+
+def test_batched_console_writes_all_lines(capsys):
+    """Test batched console writes every queued line before wait returns"""
+    from _powertools import BatchedConsole
+    console = BatchedConsole(batch_size=10)
+    
+    for i in range(3):
+        console.write(f"line {i}\n")
+    console.wait()
+    
+    assert capsys.readouterr().out == "line 0\nline 1\nline 2\n"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])